@@ -1,18 +1,82 @@
 import json
 import re
+import os
 import asyncio
+import bisect
+import hashlib
+import pickle
+import tempfile
+import atexit
 import warnings
+import weakref
 import logging
 import pkg_resources
 
+from concurrent.futures import ThreadPoolExecutor
+
+import regex
+
 import aiohttp
 import requests
+from lxml import etree
 
 from bs4 import BeautifulSoup
 from typing import Union
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from Wappalyzer import _htmlscan
+except ImportError:
+    _htmlscan = None
+
 logger = logging.getLogger(name=__name__)
 
+# Shared aiohttp sessions for callers that don't bring their own, so
+# connections and the DNS cache are pooled across fetches instead of a
+# new TCPConnector (and TLS handshake) per call. A ClientSession is
+# bound to the event loop it was created under, so one session is kept
+# per loop; repeated asyncio.run calls each get a fresh, working one.
+_default_sessions = {}
+
+
+async def _get_default_session(verify):
+    """
+    Lazily create the shared client session for the running event loop.
+    The first call's `verify` choice sticks for the session's lifetime;
+    callers needing different TLS behaviour should pass their own
+    session.
+    """
+    loop = asyncio.get_running_loop()
+    for stale in [cached for cached in _default_sessions if cached.is_closed()]:
+        del _default_sessions[stale]
+    session = _default_sessions.get(loop)
+    # No lock needed: a loop runs one callback at a time, and there is
+    # no await between the lookup and the store.
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(ssl=verify, limit=100, ttl_dns_cache=300)
+        session = aiohttp.ClientSession(connector=connector)
+        _default_sessions[loop] = session
+    return session
+
+
+@atexit.register
+def _close_default_sessions():
+    for session in _default_sessions.values():
+        if not session.closed:
+            try:
+                asyncio.run(session.close())
+            except RuntimeError:
+                pass
+
 
 class WappalyzerError(Exception):
     """
@@ -27,6 +91,9 @@ class WebPage:
     from any particular HTTP library's API.
     """
 
+    __slots__ = ('url', 'html', 'headers', 'scripts', 'meta', '_parsed_html',
+                 '_scripts_blob', '_script_offsets')
+
     def __init__(self, url, html, headers):
         """
         Initialize a new WebPage object.
@@ -44,26 +111,93 @@ class WebPage:
         self.url = url
         self.html = html
         self.headers = headers
+        self._parsed_html = None
 
         try:
             list(self.headers.keys())
         except AttributeError:
             raise ValueError("Headers must be a dictionary-like object")
 
+        # Lowercase the header names once per page: app['headers'] keys
+        # were lowercased in _prepare_app, so a case-sensitive lookup
+        # would miss headers sent in a different case.
+        self.headers = {name.lower(): value for name, value in self.headers.items()}
+
         self._parse_html()
 
+        # Joined once so each script pattern scans a single subject
+        # instead of one subject per script. '.' cannot match across
+        # the newline separator.
+        self._scripts_blob = '\n'.join(self.scripts)
+        offsets = []
+        position = 0
+        for script in self.scripts:
+            offsets.append(position)
+            position += len(script) + 1
+        self._script_offsets = offsets
+
+    def _script_at(self, offset):
+        """
+        Map an offset in the joined scripts blob back to the script it
+        falls in.
+        """
+        return self.scripts[bisect.bisect_right(self._script_offsets, offset) - 1]
+
+    # Feed size for the pull parser; bounds how much tree can pile up
+    # between event drains.
+    _chunk_size = 1 << 16
+
     def _parse_html(self):
         """
-        Parse the HTML with BeautifulSoup to find <script> and <meta> tags.
+        Extract the <script> and <meta> tags from the HTML, with the
+        compiled byte-level scanner when it is built, falling back to
+        lxml's pull parser: events are drained and elements cleared as
+        they complete so only the tags of interest are retained instead
+        of the whole document tree.
+        """
+        if _htmlscan is not None:
+            self.scripts, self.meta = _htmlscan.extract(
+                self.html.encode('utf-8', 'replace'))
+            return
+        self.scripts = []
+        self.meta = {}
+        parser = etree.HTMLPullParser(events=('end',))
+        try:
+            for offset in range(0, len(self.html), self._chunk_size):
+                parser.feed(self.html[offset:offset + self._chunk_size])
+                self._collect_tags(parser)
+            parser.close()
+        except etree.XMLSyntaxError:
+            # Empty or hopelessly malformed document
+            pass
+        self._collect_tags(parser)
+
+    def _collect_tags(self, parser):
+        """
+        Pull completed <script> and <meta> elements out of the parser
+        event queue, then clear each element to keep peak memory small.
+        """
+        for _, element in parser.read_events():
+            if element.tag == 'script':
+                src = element.get('src')
+                if src:
+                    self.scripts.append(src)
+            elif element.tag == 'meta':
+                name = element.get('name')
+                content = element.get('content')
+                if name and content:
+                    self.meta[name.lower()] = content
+            element.clear()
+
+    @property
+    def parsed_html(self):
         """
-        self.parsed_html = soup = BeautifulSoup(self.html, 'lxml')
-        self.scripts = [script['src'] for script in
-                        soup.findAll('script', src=True)]
-        self.meta = {
-            meta['name'].lower():
-                meta['content'] for meta in soup.findAll(
-                    'meta', attrs=dict(name=True, content=True))
-        }
+        BeautifulSoup parse of the HTML, built lazily for backward
+        compatibility; detection no longer needs the soup tree.
+        """
+        if self._parsed_html is None:
+            self._parsed_html = BeautifulSoup(self.html, 'lxml')
+        return self._parsed_html
 
     @classmethod
     def new_from_url(cls, url: str, verify: bool = True, timeout: Union[int, float] = 2.5):
@@ -89,6 +223,10 @@ class WebPage:
         Constructs a new WebPage object for the URL,
         using the `aiohttp` module to fetch the HTML.
 
+        Without an explicit session the shared module session is used,
+        so repeated calls reuse connections and DNS lookups. A session
+        passed by the caller is used as-is.
+
         Parameters
         ----------
 
@@ -97,8 +235,7 @@ class WebPage:
         """
 
         if not aiohttp_client_session:
-            connector = aiohttp.TCPConnector(ssl=verify)
-            aiohttp_client_session = aiohttp.ClientSession(connector=connector)
+            aiohttp_client_session = await _get_default_session(verify)
 
         async with aiohttp_client_session.get(url, timeout=timeout) as response:
             return await cls.new_from_response_async(response)
@@ -130,12 +267,52 @@ class WebPage:
         html = await response.text()
         return cls(response.url, html=html, headers=response.headers)
 
+class DetectionState:
+    """
+    Mutable per-analysis detection state (confidence, versions, totals),
+    kept out of the shared app dicts so repeated analyze calls don't
+    accumulate results across pages or race under the thread pool.
+    """
+
+    __slots__ = ('confidence', 'versions', 'totals')
+
+    def __init__(self):
+        # app name -> {pattern key -> confidence}
+        self.confidence = {}
+        # app name -> [version, ...], shortest first
+        self.versions = {}
+        # app name -> summed confidence, for detected apps
+        self.totals = {}
+
+    def merge(self, other):
+        """
+        Fold another state (e.g. from a scan chunk) into this one.
+        """
+        for app_name, confidence in other.confidence.items():
+            self.confidence.setdefault(app_name, {}).update(confidence)
+        for app_name, versions in other.versions.items():
+            mine = self.versions.setdefault(app_name, [])
+            for version in versions:
+                if version not in mine:
+                    mine.append(version)
+            mine.sort(key=len)
+
+
 class Wappalyzer:
     """
     Python Wappalyzer driver.
     """
 
-    def __init__(self, categories, apps):
+    # Bump whenever the prepared app structure changes, so stale pickle
+    # caches from older code are discarded instead of loaded.
+    _cache_version = 4
+
+    # Ternary version expressions ('\\1?a:b') reference back references
+    # by number; compiled once here instead of on every match.
+    _ternary_regexes = [re.compile(r'\\' + str(index) + r'\?([^:]+):(.*)$', re.I)
+                        for index in range(1, 10)]
+
+    def __init__(self, categories, apps, prepared=False):
         """
         Initialize a new Wappalyzer instance.
 
@@ -146,26 +323,79 @@ class Wappalyzer:
             Map of category ids to names, as in apps.json.
         apps : dict
             Map of app names to app dicts, as in apps.json.
+        prepared : bool
+            Whether the apps have already been through `_prepare_app`
+            (e.g. loaded from the pickle cache), so preparation is skipped.
         """
         self.categories = categories
         self.apps = apps
 
-        for name, app in list(self.apps.items()):
-            self._prepare_app(app)
+        if not prepared:
+            for app in self.apps.values():
+                self._prepare_app(app)
+
+        self._prefilter = None
+        self._literal_automaton = None
+        self._literal_always_ids = frozenset()
+        if hyperscan is not None:
+            self._build_prefilter()
+        elif ahocorasick is not None:
+            self._build_literal_prefilter()
+
+        self._build_arrays()
+        self._build_implies_closure()
+
+        # Regex matching releases the GIL on large subjects, so the app
+        # scans parallelize across threads. The finalizer stops a
+        # discarded instance from leaking its worker threads.
+        self._pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+        weakref.finalize(self, self._pool.shutdown, wait=False)
+
+        # State of the most recent analyze call, read by get_versions
+        # and get_confidence.
+        self._last_detection = DetectionState()
 
     @classmethod
     def latest(cls, apps_file=None):
         """
         Construct a Wappalyzer instance using a apps db path passed in via
         apps_file, or alternatively the default in data/apps.json
+
+        The prepared apps (compiled patterns included) are cached in a
+        pickle next to the json, keyed by its content hash, so subsequent
+        starts skip the per-pattern compiles.
         """
         if apps_file:
-            with open(apps_file, 'r') as file:
-                obj = json.load(file)
+            with open(apps_file, 'rb') as file:
+                raw = file.read()
+            cache_dir = os.path.dirname(os.path.abspath(apps_file))
         else:
-            obj = json.loads(pkg_resources.resource_string(__name__, "data/apps.json"))
+            raw = pkg_resources.resource_string(__name__, "data/apps.json")
+            cache_dir = pkg_resources.resource_filename(__name__, "data")
 
-        return cls(categories=obj['categories'], apps=obj['apps'])
+        digest = hashlib.sha1(raw).hexdigest()
+        cache_file = os.path.join(cache_dir, 'apps.{digest}.pkl'.format(digest=digest))
+        try:
+            with open(cache_file, 'rb') as file:
+                version, categories, apps = pickle.load(file)
+        except (OSError, EOFError, ValueError, pickle.PickleError):
+            pass
+        else:
+            if version == cls._cache_version:
+                return cls(categories=categories, apps=apps, prepared=True)
+
+        obj = json.loads(raw)
+        instance = cls(categories=obj['categories'], apps=obj['apps'])
+        try:
+            handle, temp_file = tempfile.mkstemp(dir=cache_dir, suffix='.pkl')
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump((cls._cache_version, instance.categories, instance.apps), file)
+            # Atomic, so a concurrent start never sees a partial cache
+            os.replace(temp_file, cache_file)
+        except (OSError, pickle.PickleError):
+            pass
+
+        return instance
 
     def _prepare_app(self, app):
         """
@@ -197,7 +427,7 @@ class Wappalyzer:
         # Ensure keys are lowercase
         for key in ['headers', 'meta']:
             obj = app[key]
-            app[key] = {k.lower(): v for k, v in list(obj.items())}
+            app[key] = {k.lower(): v for k, v in obj.items()}
 
         # Prepare regular expression patterns
         for key in ['url', 'html', 'script']:
@@ -205,111 +435,514 @@ class Wappalyzer:
 
         for key in ['headers', 'meta']:
             obj = app[key]
-            for name, pattern in list(obj.items()):
+            # Reassigning values does not resize the dict, so no copy
+            # of the items is needed while iterating
+            for name in obj:
                 obj[name] = self._prepare_pattern(obj[name])
 
+        # Fuse the html and script patterns into one alternation regex each,
+        # so the subject is scanned once per app instead of once per pattern.
+        app['_html_fused'], app['_html_rest'] = self._fuse_patterns(app['html'])
+
+        # '^'/'$'-anchored script patterns must see each src on its own:
+        # in the joined blob the anchors only exist at its edges, so the
+        # blob scan would miss every other script.
+        anchored = []
+        unanchored = []
+        for pattern in app['script']:
+            if self._is_anchored(pattern['string']):
+                anchored.append(pattern)
+            else:
+                unanchored.append(pattern)
+        app['_script_anchored'] = anchored
+        app['_script_fused'], app['_script_rest'] = self._fuse_patterns(unanchored)
+
+        # Bitmask of the fields the app actually uses, so analyze can
+        # skip whole branches for the many apps with empty fields.
+        app['_fields'] = (bool(app['url']) |
+                          bool(app['html']) << 1 |
+                          bool(app['script']) << 2 |
+                          bool(app['headers']) << 3 |
+                          bool(app['meta']) << 4)
+
+    def _build_prefilter(self):
+        """
+        Compile every html and script pattern into one hyperscan database
+        used as a prefilter: a single pass over the page yields the set of
+        patterns that can possibly match, and `_has_app` skips the html and
+        script scans entirely for apps without any candidate hit.
+
+        Patterns hyperscan cannot express are left out of the database and
+        their app field always falls through to the regular scan.
+
+        MULTILINE lets '^'/'$' anchors also match at the newlines of the
+        joined scripts blob, where each script is one line; without it an
+        anchored script pattern could never hit and its app would be
+        filtered out. For the html subject this only widens where anchors
+        match, which a prefilter is allowed to do.
+        """
+        flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH |
+                 hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_ALLOWEMPTY |
+                 hyperscan.HS_FLAG_MULTILINE)
+        expressions = []
+        probe = hyperscan.Database()
+        for app in self.apps.values():
+            for key in ['html', 'script']:
+                field_expressions = []
+                for pattern in app[key]:
+                    expression = pattern['string'].encode('utf-8', 'replace')
+                    try:
+                        probe.compile(expressions=[expression], ids=[0], flags=[flags])
+                    except hyperscan.error:
+                        field_expressions = None
+                        break
+                    field_expressions.append(expression)
+                if field_expressions is None:
+                    app['_pf_{key}_ids'.format(key=key)] = None
+                else:
+                    start = len(expressions)
+                    expressions.extend(field_expressions)
+                    app['_pf_{key}_ids'.format(key=key)] = frozenset(
+                        range(start, start + len(field_expressions)))
+
+        if not expressions:
+            return
+
+        database = hyperscan.Database()
+        try:
+            database.compile(expressions=expressions, ids=list(range(len(expressions))),
+                             flags=[flags] * len(expressions))
+        except hyperscan.error as err:
+            warnings.warn(
+                "Caught '{error}' compiling hyperscan prefilter, disabling it".format(error=err)
+            )
+            return
+        self._prefilter = database
+
+    def _build_literal_prefilter(self):
+        """
+        Build an Aho-Corasick automaton over literal substrings required
+        by the html and script patterns, in the spirit of RE2's
+        FilteredRE2: one linear pass over the page yields the candidate
+        patterns, and the rest never run. Used when hyperscan is absent.
+
+        Patterns no usable literal can be derived from are recorded as
+        always-candidates.
+        """
+        automaton = ahocorasick.Automaton()
+        literal_ids = {}
+        always_ids = set()
+        next_id = 0
+        for app in self.apps.values():
+            for key in ['html', 'script']:
+                field_ids = []
+                for pattern in app[key]:
+                    field_ids.append(next_id)
+                    literal = self._required_literal(pattern['string'])
+                    if len(literal) >= 3:
+                        literal_ids.setdefault(literal.lower(), set()).add(next_id)
+                    else:
+                        always_ids.add(next_id)
+                    next_id += 1
+                app['_pf_{key}_ids'.format(key=key)] = frozenset(field_ids)
+
+        if not literal_ids:
+            return
+        for literal, ids in literal_ids.items():
+            automaton.add_word(literal, frozenset(ids))
+        automaton.make_automaton()
+        self._literal_automaton = automaton
+        self._literal_always_ids = frozenset(always_ids)
+
+    @staticmethod
+    def _required_literal(expression):
+        """
+        Derive a literal substring every match of the expression must
+        contain, or '' when none can be derived safely. Deliberately
+        conservative: any construct that makes the current run optional
+        or ambiguous just ends the run.
+        """
+        if '|' in expression:
+            # A required literal would have to occur in every branch
+            return ''
+        best = ''
+        run = ''
+        index = 0
+        length = len(expression)
+        while index < length:
+            char = expression[index]
+            if char == '\\':
+                index += 1
+                if index >= length:
+                    break
+                escaped = expression[index]
+                if escaped.isalnum():
+                    # Character class shorthand or back reference
+                    if len(run) > len(best):
+                        best = run
+                    run = ''
+                    if escaped in 'xuU':
+                        # Skip the code point digits of \xhh, \uhhhh, \Uhhhhhhhh
+                        index += {'x': 2, 'u': 4, 'U': 8}[escaped]
+                else:
+                    run += escaped
+                index += 1
+                continue
+            if char in '*?{':
+                # Quantifier: the preceding unit is optional or repeats,
+                # so it cannot extend the contiguous run
+                run = run[:-1]
+                if char == '{':
+                    while index < length and expression[index] != '}':
+                        index += 1
+                if len(run) > len(best):
+                    best = run
+                run = ''
+                index += 1
+                continue
+            if char == '+':
+                # Required at least once, but repeats break contiguity
+                if len(run) > len(best):
+                    best = run
+                run = ''
+                index += 1
+                continue
+            if char == '(':
+                depth = 1
+                index += 1
+                while index < length and depth:
+                    if expression[index] == '\\':
+                        index += 1
+                    elif expression[index] == '(':
+                        depth += 1
+                    elif expression[index] == ')':
+                        depth -= 1
+                    index += 1
+                if len(run) > len(best):
+                    best = run
+                run = ''
+                continue
+            if char == '[':
+                index += 1
+                if index < length and expression[index] == ']':
+                    index += 1
+                while index < length and expression[index] != ']':
+                    if expression[index] == '\\':
+                        index += 1
+                    index += 1
+                index += 1
+                if len(run) > len(best):
+                    best = run
+                run = ''
+                continue
+            if char in '.^$':
+                if len(run) > len(best):
+                    best = run
+                run = ''
+                index += 1
+                continue
+            run += char
+            index += 1
+        if len(run) > len(best):
+            best = run
+        return best
+
+    def _prefilter_scan(self, webpage):
+        """
+        Run the prefilter over the page html and scripts, and return the
+        set of pattern ids that may match, or None when no prefilter is
+        available.
+        """
+        if self._prefilter is not None:
+            hits = set()
+
+            def on_match(pattern_id, start, end, flags, context):
+                hits.add(pattern_id)
+
+            self._prefilter.scan(webpage.html.encode('utf-8', 'replace'),
+                                 match_event_handler=on_match)
+            if webpage.scripts:
+                # Joined with a newline, which '.' cannot match across.
+                self._prefilter.scan('\n'.join(webpage.scripts).encode('utf-8', 'replace'),
+                                     match_event_handler=on_match)
+            return hits
+
+        if self._literal_automaton is not None:
+            hits = set(self._literal_always_ids)
+            for subject in (webpage.html, webpage._scripts_blob):
+                if subject:
+                    for _, ids in self._literal_automaton.iter(subject.lower()):
+                        hits |= ids
+            return hits
+
+        return None
+
+    @staticmethod
+    def _is_anchored(expression):
+        """
+        Whether the expression uses a '^' or '$' anchor (escaped anchors
+        and '^' negating a character class don't count), meaning it must
+        be matched against each subject individually rather than a blob
+        of joined subjects.
+        """
+        in_class = False
+        index = 0
+        length = len(expression)
+        while index < length:
+            char = expression[index]
+            if char == '\\':
+                index += 2
+                continue
+            if in_class:
+                if char == ']':
+                    in_class = False
+            elif char == '[':
+                in_class = True
+            elif char == '^' or char == '$':
+                return True
+            index += 1
+        return False
+
+    def _fuse_patterns(self, patterns):
+        """
+        Combine prepared patterns into a single alternation regex of named
+        groups ``(?P<p0>...)|(?P<p1>...)``, compiled once, so that one scan
+        of the subject covers every pattern. The matching sub-pattern is
+        recovered from the group name.
+
+        Returns a ``(fused, rest)`` tuple where ``fused`` is a dict with the
+        combined ``regex`` and a ``map`` back to the original pattern dicts,
+        or None when fusing isn't worthwhile. ``rest`` holds the patterns
+        that cannot take part in the alternation (broken patterns, or ones
+        relying on their own group numbering) and must still be scanned
+        individually.
+        """
+        fusable = []
+        rest = []
+        for pattern in patterns:
+            expression = pattern['string']
+            # Back references and named groups rely on the pattern's own
+            # group numbering/names, which fusing would shift or clash.
+            if re.search(r'\\[1-9]', expression) or '(?P<' in expression:
+                rest.append(pattern)
+                continue
+            try:
+                regex.compile('(?P<p0>{})'.format(expression), regex.IGNORECASE)
+            except regex.error:
+                rest.append(pattern)
+                continue
+            fusable.append(pattern)
+
+        if len(fusable) < 2:
+            return None, patterns
+
+        combined = '|'.join(
+            '(?P<p{index}>{expression})'.format(index=index, expression=pattern['string'])
+            for index, pattern in enumerate(fusable)
+        )
+        try:
+            fused_regex = regex.compile(combined, regex.IGNORECASE)
+        except regex.error as err:
+            warnings.warn(
+                "Caught '{error}' fusing regexes, falling back to per-pattern scans".format(error=err)
+            )
+            return None, patterns
+
+        return {'regex': fused_regex, '_finditer': fused_regex.finditer, 'map': fusable}, rest
+
+    # Many apps share identical pattern strings (generic jquery, ga.js,
+    # ...); interning the prepared dicts compiles each distinct regex
+    # once across all apps and instances.
+    _pattern_cache = {}
+
     def _prepare_pattern(self, pattern):
         """
         Strip out key:value pairs from the pattern and compile the regular
-        expression.
+        expression. Identical pattern strings share one prepared dict.
         """
+        cached = self._pattern_cache.get(pattern)
+        if cached is not None:
+            return cached
+        # The attribute loop below reuses `key`, so the cache key needs
+        # its own name or attribute-carrying patterns would be stored
+        # under 'version'/'confidence' instead of their pattern string.
+        cache_key = pattern
         attrs = {}
         pattern = pattern.split('\\;')
         for index, expression in enumerate(pattern):
             if index == 0:
                 attrs['string'] = expression
                 try:
-                    attrs['regex'] = re.compile(expression, re.I)
-                except re.error as err:
+                    # The regex module matches faster than re on the
+                    # backtracking-heavy patterns found in apps.json.
+                    attrs['regex'] = regex.compile(expression, regex.IGNORECASE)
+                except regex.error as err:
                     warnings.warn(
                         "Caught '{error}' compiling regex: {regex}".format(error=err, regex=pattern)
                     )
                     # regex that never matches:
                     # http://stackoverflow.com/a/1845097/413622
-                    attrs['regex'] = re.compile(r'(?!x)x')
+                    attrs['regex'] = regex.compile(r'(?!x)x')
             else:
                 attr = expression.split(':')
                 if len(attr) > 1:
                     key = attr.pop(0)
                     attrs[str(key)] = ':'.join(attr)
+        # Bind the matcher methods once; saves two dict lookups per call
+        # in the hot loops.
+        attrs['_search'] = attrs['regex'].search
+        attrs['_finditer'] = attrs['regex'].finditer
+        attrs['_ngroups'] = attrs['regex'].groups
+        self._pattern_cache[cache_key] = attrs
         return attrs
 
-    def _has_app(self, app_name, app, webpage):
+    def _build_arrays(self):
         """
-        Determine whether the web page matches the app signature.
+        Flatten the prepared apps into parallel per-field arrays, so the
+        hot loops in analyze iterate contiguous lists instead of chasing
+        the nested app dicts. Header and meta patterns are inverted into
+        dicts keyed by name, letting analyze walk the page's few headers
+        and meta tags rather than every app's.
         """
-        has_app = False
-        # Search the easiest things first and save the full-text search of the
-        # HTML for last
-
-        for pattern in app['url']:
-            if pattern['regex'].search(webpage.url):
-                self._set_detected_app(app_name, app, 'url', pattern, webpage.url)
-
-        for name, pattern in list(app['headers'].items()):
-            if name in webpage.headers:
-                content = webpage.headers[name]
-                if pattern['regex'].search(content):
-                    self._set_detected_app(app_name, app, 'headers', pattern, content, name)
-                    has_app = True
-
-        for pattern in app['script']:
-            for script in webpage.scripts:
-                if pattern['regex'].search(script):
-                    self._set_detected_app(app_name, app, 'script', pattern, script)
-                    has_app = True
-
-        for name, pattern in list(app['meta'].items()):
-            if name in webpage.meta:
-                content = webpage.meta[name]
-                if pattern['regex'].search(content):
-                    self._set_detected_app(app_name, app, 'meta', pattern, content, name)
-                    has_app = True
-
-        for pattern in app['html']:
-            if pattern['regex'].search(webpage.html):
-                self._set_detected_app(app_name, app, 'html', pattern, webpage.html)
-                has_app = True
-
-        # Set total confidence
-        if has_app:
-            total = 0
-            for index in app['confidence']:
-                total += app['confidence'][index]
-            app['confidenceTotal'] = total
-
-        return has_app
-
-    def _set_detected_app(self, app_name, app, app_type, pattern, value, key=''):
+        self._app_names = list(self.apps)
+        self._app_list = list(self.apps.values())
+        self._url_patterns = []
+        self._header_patterns = {}
+        self._meta_patterns = {}
+        self._html_scans = []
+        self._script_scans = []
+        for app_idx, app in enumerate(self._app_list):
+            fields = app['_fields']
+            if fields & 1:
+                for pattern in app['url']:
+                    self._url_patterns.append((app_idx, pattern))
+            if fields & 8:
+                for name, pattern in app['headers'].items():
+                    self._header_patterns.setdefault(name, []).append((app_idx, pattern))
+            if fields & 16:
+                for name, pattern in app['meta'].items():
+                    self._meta_patterns.setdefault(name, []).append((app_idx, pattern))
+            if fields & 2:
+                self._html_scans.append((app_idx, app['_html_fused'], app['_html_rest']))
+            if fields & 4:
+                self._script_scans.append((app_idx, app['_script_fused'],
+                                           app['_script_rest'], app['_script_anchored']))
+
+    def _scan_html_chunk(self, scans, webpage, prefilter_hits):
         """
-        Store detected app.
+        Run a slice of the html scan array against the page, returning
+        the indexes of the apps that matched and the chunk's own
+        detection state.
+        """
+        detected = set()
+        state = DetectionState()
+        html = webpage.html
+        for app_idx, fused, rest in scans:
+            app = self._app_list[app_idx]
+            if not self._field_may_match(app, 'html', prefilter_hits):
+                continue
+            app_name = self._app_names[app_idx]
+            if fused:
+                matched = set()
+                for match in fused['_finditer'](html):
+                    matched.add(int(match.lastgroup[1:]))
+                for index in matched:
+                    self._set_detected_app(state, app_name, 'html', fused['map'][index], html)
+                    detected.add(app_idx)
+            for pattern in rest:
+                if pattern['_search'](html):
+                    self._set_detected_app(state, app_name, 'html', pattern, html)
+                    detected.add(app_idx)
+        return detected, state
+
+    def _scan_scripts_chunk(self, scans, webpage, prefilter_hits):
+        """
+        Run a slice of the script scan array against the joined scripts
+        blob (anchored patterns against each script individually),
+        returning the indexes of the apps that matched and the chunk's
+        own detection state.
+        """
+        detected = set()
+        state = DetectionState()
+        blob = webpage._scripts_blob
+        for app_idx, fused, rest, anchored in scans:
+            app = self._app_list[app_idx]
+            if not self._field_may_match(app, 'script', prefilter_hits):
+                continue
+            app_name = self._app_names[app_idx]
+            if fused:
+                matched = set()
+                for match in fused['_finditer'](blob):
+                    matched.add((int(match.lastgroup[1:]),
+                                 webpage._script_at(match.start())))
+                for index, script in matched:
+                    self._set_detected_app(state, app_name, 'script',
+                                           fused['map'][index], script)
+                    detected.add(app_idx)
+            for pattern in rest:
+                matched = {webpage._script_at(match.start())
+                           for match in pattern['_finditer'](blob)}
+                for script in matched:
+                    self._set_detected_app(state, app_name, 'script', pattern, script)
+                    detected.add(app_idx)
+            for pattern in anchored:
+                for script in webpage.scripts:
+                    if pattern['_search'](script):
+                        self._set_detected_app(state, app_name, 'script', pattern, script)
+                        detected.add(app_idx)
+        return detected, state
+
+    def _field_may_match(self, app, key, prefilter_hits):
+        """
+        Decide from the prefilter hits whether the app's patterns for this
+        field can possibly match. Always True without a prefilter, or when
+        the field holds patterns the prefilter cannot express.
+        """
+        if prefilter_hits is None:
+            return True
+        ids = app['_pf_{key}_ids'.format(key=key)]
+        if ids is None:
+            return True
+        return bool(ids & prefilter_hits)
+
+    def _set_detected_app(self, state, app_name, app_type, pattern, value, key=''):
+        """
+        Record the match in the per-analysis detection state.
         """
-        app['detected'] = True
-
         # Set confidence level
         if key != '':
             key += ' '
-        if 'confidence' not in app:
-            app['confidence'] = {}
         if 'confidence' not in pattern:
             pattern['confidence'] = 100
         else:
             # Convert to int for easy adding later
             pattern['confidence'] = int(pattern['confidence'])
-        app['confidence'][app_type + ' ' + key + pattern['string']] = pattern['confidence']
+        confidence = state.confidence.setdefault(app_name, {})
+        confidence[app_type + ' ' + key + pattern['string']] = pattern['confidence']
 
         # Dectect version number
         if 'version' in pattern:
-            allmatches = re.findall(pattern['regex'], value)
-            for i, matches in enumerate(allmatches):
-                version = pattern['version']
-                
-                # Check for a string to avoid enumerating the string
-                if isinstance(matches, str):
-                    matches = [(matches)]
+            version_template = pattern['version']
+            if '\\' not in version_template:
+                # No back references: every match yields the template
+                # verbatim, and the pattern is known to match the value
+                if version_template != '':
+                    versions = state.versions.setdefault(app_name, [])
+                    if version_template not in versions:
+                        versions.append(version_template)
+                        versions.sort(key=len)
+                return app_name
+            ngroups = pattern['_ngroups']
+            for found in pattern['_finditer'](value):
+                version = version_template
+                # Non-participating groups behave like findall's ''
+                matches = found.groups('') if ngroups else (found.group(0),)
                 for index, match in enumerate(matches):
                     # Parse ternary operator
-                    ternary = re.search(re.compile('\\\\' + str(index + 1) + '\\?([^:]+):(.*)$', re.I), version)
+                    if index < len(self._ternary_regexes):
+                        ternary = self._ternary_regexes[index].search(version)
+                    else:
+                        ternary = re.search('\\\\' + str(index + 1) + '\\?([^:]+):(.*)$', version, re.I)
                     if ternary and len(ternary.groups()) == 2 and ternary.group(1) is not None and ternary.group(2) is not None:
                         version = version.replace(ternary.group(0), ternary.group(1) if match != ''
                                                   else ternary.group(2))
@@ -317,45 +950,46 @@ class Wappalyzer:
                     # Replace back references
                     version = version.replace('\\' + str(index + 1), match)
                 if version != '':
-                    if 'versions' not in app:
-                        app['versions'] = [version]
-                    elif version not in app['versions']:
-                        app['versions'].append(version)
-            self._set_app_version(app)
+                    versions = state.versions.setdefault(app_name, [])
+                    if version not in versions:
+                        versions.append(version)
+            if app_name in state.versions:
+                state.versions[app_name].sort(key=len)
 
         return app_name
 
-    def _set_app_version(self, app):
+    def _build_implies_closure(self):
         """
-        Resolve version number (find the longest version number that contains all shorter detected version numbers).
+        Precompute, for each app, the transitive set of apps it implies.
+        The implies graph is static, so analyze can union the stored
+        frozensets instead of re-walking the graph on every call.
         """
-        if 'versions' not in app:
-            return
-
-        app['versions'] = sorted(app['versions'], key=self._cmp_to_key(self._sort_app_versions))
+        self._implies_closure = {}
+        for name, app in self.apps.items():
+            reachable = set()
+            stack = list(app['implies'])
+            while stack:
+                implied = stack.pop()
+                if implied in reachable:
+                    continue
+                reachable.add(implied)
+                try:
+                    stack.extend(self.apps[implied]['implies'])
+                except KeyError:
+                    pass
+            self._implies_closure[name] = frozenset(reachable)
 
     def _get_implied_apps(self, detected_apps):
         """
         Get the set of apps implied by `detected_apps`.
         """
-        def __get_implied_apps(apps):
-            _implied_apps = set()
-            for app in apps:
-                try:
-                    _implied_apps.update(set(self.apps[app]['implies']))
-                except KeyError:
-                    pass
-            return _implied_apps
-
-        implied_apps = __get_implied_apps(detected_apps)
-        all_implied_apps = set()
-
-        # Descend recursively until we've found all implied apps
-        while not all_implied_apps.issuperset(implied_apps):
-            all_implied_apps.update(implied_apps)
-            implied_apps = __get_implied_apps(all_implied_apps)
-
-        return all_implied_apps
+        implied_apps = set()
+        for app in detected_apps:
+            try:
+                implied_apps |= self._implies_closure[app]
+            except KeyError:
+                pass
+        return implied_apps
 
     def get_categories(self, app_name):
         """
@@ -371,30 +1005,83 @@ class Wappalyzer:
         """
         Retuns a list of the discovered versions for an app name.
         """
-        return [] if 'versions' not in self.apps[app_name] else self.apps[app_name]['versions']
+        return self._last_detection.versions.get(app_name, [])
 
     def get_confidence(self, app_name):
         """
         Returns the total confidence for an app name.
         """
-        return [] if 'confidenceTotal' not in self.apps[app_name] else self.apps[app_name]['confidenceTotal']
+        if app_name not in self._last_detection.totals:
+            return []
+        return self._last_detection.totals[app_name]
 
     def analyze(self, webpage):
         """
         Return a list of applications that can be detected on the web page.
         """
-        detected_apps = set()
+        detected = set()
+        state = DetectionState()
+        prefilter_hits = self._prefilter_scan(webpage)
 
-        # Check for app
-        for app_name, app in list(self.apps.items()):
-            if self._has_app(app_name, app, webpage):
-                detected_apps.add(app_name)
+        # Search the easiest things first and save the full-text search of the
+        # HTML for last. A url match records confidence but, as before,
+        # does not count as a detection on its own.
+        for app_idx, pattern in self._url_patterns:
+            if pattern['_search'](webpage.url):
+                self._set_detected_app(state, self._app_names[app_idx],
+                                       'url', pattern, webpage.url)
+
+        for name, content in webpage.headers.items():
+            for app_idx, pattern in self._header_patterns.get(name, ()):
+                if pattern['_search'](content):
+                    self._set_detected_app(state, self._app_names[app_idx],
+                                           'headers', pattern, content, name)
+                    detected.add(app_idx)
+
+        for name, content in webpage.meta.items():
+            for app_idx, pattern in self._meta_patterns.get(name, ()):
+                if pattern['_search'](content):
+                    self._set_detected_app(state, self._app_names[app_idx],
+                                           'meta', pattern, content, name)
+                    detected.add(app_idx)
+
+        # The full-text scans parallelize across the pool. Each chunk
+        # fills its own DetectionState, merged here, so the workers
+        # share nothing mutable.
+        workers = os.cpu_count() or 1
+        futures = [self._pool.submit(self._scan_html_chunk, chunk, webpage, prefilter_hits)
+                   for chunk in self._chunked(self._html_scans, workers)]
+        if webpage._scripts_blob:
+            futures += [self._pool.submit(self._scan_scripts_chunk, chunk, webpage, prefilter_hits)
+                        for chunk in self._chunked(self._script_scans, workers)]
+        for future in futures:
+            chunk_detected, chunk_state = future.result()
+            detected |= chunk_detected
+            state.merge(chunk_state)
+
+        # Set total confidence
+        detected_apps = set()
+        for app_idx in detected:
+            app_name = self._app_names[app_idx]
+            state.totals[app_name] = sum(state.confidence[app_name].values())
+            detected_apps.add(app_name)
 
         # Add implied apps
         detected_apps |= self._get_implied_apps(detected_apps)
 
+        self._last_detection = state
         return detected_apps
 
+    @staticmethod
+    def _chunked(items, count):
+        """
+        Split a list into at most `count` roughly equal chunks.
+        """
+        for offset in range(count):
+            chunk = items[offset::count]
+            if chunk:
+                yield chunk
+
     def analyze_with_versions(self, webpage):
         """
         Return a list of applications and versions that can be detected on the web page.
@@ -430,30 +1117,3 @@ class Wappalyzer:
             versioned_and_categorised_apps[app_name]["categories"] = cat_names
 
         return versioned_and_categorised_apps
-
-    def _sort_app_versions(self, version_a, version_b):
-        return len(version_a) - len(version_b)
-
-    def _cmp_to_key(self, mycmp):
-        """
-        Convert a cmp= function into a key= function
-        """
-
-        # https://docs.python.org/3/howto/sorting.html
-        class CmpToKey:
-            def __init__(self, obj, *args):
-                self.obj = obj
-            def __lt__(self, other):
-                return mycmp(self.obj, other.obj) < 0
-            def __gt__(self, other):
-                return mycmp(self.obj, other.obj) > 0
-            def __eq__(self, other):
-                return mycmp(self.obj, other.obj) == 0
-            def __le__(self, other):
-                return mycmp(self.obj, other.obj) <= 0
-            def __ge__(self, other):
-                return mycmp(self.obj, other.obj) >= 0
-            def __ne__(self, other):
-                return mycmp(self.obj, other.obj) != 0
-
-        return CmpToKey
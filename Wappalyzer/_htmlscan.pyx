@@ -0,0 +1,163 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Byte-level scanner for the only two tag shapes detection needs:
+``<script src=...>`` and ``<meta name=... content=...>``.
+
+Walks the raw bytes once with no tree construction and no per-character
+Python objects. Compiled with Cython at install time when available;
+`WebPage._parse_html` falls back to the lxml pull parser otherwise.
+"""
+
+from libc.string cimport memchr
+
+from html import unescape
+
+
+cdef inline int _lower(int c):
+    if 65 <= c <= 90:
+        return c + 32
+    return c
+
+
+cdef inline bint _is_space(int c):
+    return c == 32 or c == 9 or c == 10 or c == 13 or c == 12
+
+
+cdef inline bint _match_ci(const unsigned char* data, Py_ssize_t size,
+                           Py_ssize_t pos, const unsigned char* word,
+                           Py_ssize_t length):
+    cdef Py_ssize_t i
+    if pos + length > size:
+        return False
+    for i in range(length):
+        if _lower(data[pos + i]) != word[i]:
+            return False
+    return True
+
+
+cdef inline unicode _text(const unsigned char* data, Py_ssize_t start,
+                          Py_ssize_t end):
+    """
+    Decode an attribute value slice, resolving character references
+    ('&amp;' in src URLs and the like) the way the tree-building
+    parsers do.
+    """
+    cdef unicode value = bytes(data[start:end]).decode('utf-8', 'replace')
+    if u'&' in value:
+        value = unescape(value)
+    return value
+
+
+cdef Py_ssize_t _parse_attrs(const unsigned char* data, Py_ssize_t size,
+                             Py_ssize_t pos, dict attrs) except -1:
+    """
+    Parse name=value pairs from `pos` (just after the tag name) up to the
+    closing '>', filling `attrs` with lowercased names mapped to
+    (start, end) value slices. Returns the position just after '>'.
+    """
+    cdef Py_ssize_t name_start, name_end, value_start
+    cdef int quote
+    while pos < size and data[pos] != b'>':
+        if _is_space(data[pos]) or data[pos] == b'/':
+            pos += 1
+            continue
+        name_start = pos
+        while (pos < size and not _is_space(data[pos])
+               and data[pos] != b'=' and data[pos] != b'>'
+               and data[pos] != b'/'):
+            pos += 1
+        name_end = pos
+        while pos < size and _is_space(data[pos]):
+            pos += 1
+        if pos >= size or data[pos] != b'=':
+            # Boolean attribute; no value to record
+            continue
+        pos += 1
+        while pos < size and _is_space(data[pos]):
+            pos += 1
+        if pos < size and (data[pos] == b'"' or data[pos] == b"'"):
+            quote = data[pos]
+            pos += 1
+            value_start = pos
+            while pos < size and data[pos] != quote:
+                pos += 1
+            attrs[bytes(data[name_start:name_end]).lower()] = (value_start, pos)
+            if pos < size:
+                pos += 1
+        else:
+            value_start = pos
+            while (pos < size and not _is_space(data[pos])
+                   and data[pos] != b'>'):
+                pos += 1
+            attrs[bytes(data[name_start:name_end]).lower()] = (value_start, pos)
+    if pos < size:
+        pos += 1
+    return pos
+
+
+cpdef tuple extract(bytes html):
+    """
+    Return ``(scripts, meta)`` for the document: the list of script src
+    values and the dict of lowercased meta names to content values.
+    """
+    cdef const unsigned char* data = html
+    cdef Py_ssize_t size = len(html)
+    cdef Py_ssize_t pos = 0, tag_end
+    cdef const char* found
+    cdef dict attrs
+    cdef list scripts = []
+    cdef dict meta = {}
+
+    while pos < size:
+        found = <const char*>memchr(data + pos, b'<', size - pos)
+        if found == NULL:
+            break
+        pos = found - <const char*>data
+        if _match_ci(data, size, pos, b'<!--', 4):
+            # Comment: skip to '-->'
+            pos += 4
+            while pos < size:
+                found = <const char*>memchr(data + pos, b'-', size - pos)
+                if found == NULL:
+                    return scripts, meta
+                pos = found - <const char*>data
+                if _match_ci(data, size, pos, b'-->', 3):
+                    pos += 3
+                    break
+                pos += 1
+            continue
+        if _match_ci(data, size, pos, b'<script', 7) and (
+                pos + 7 >= size or _is_space(data[pos + 7])
+                or data[pos + 7] == b'>' or data[pos + 7] == b'/'):
+            attrs = {}
+            tag_end = _parse_attrs(data, size, pos + 7, attrs)
+            if b'src' in attrs:
+                value_start, value_end = attrs[b'src']
+                scripts.append(_text(data, value_start, value_end))
+            # Script content is raw text: skip to the closing tag so
+            # markup-looking strings inside it aren't picked up.
+            pos = tag_end
+            if tag_end < 2 or data[tag_end - 2] != b'/':
+                while pos < size:
+                    found = <const char*>memchr(data + pos, b'<', size - pos)
+                    if found == NULL:
+                        return scripts, meta
+                    pos = found - <const char*>data
+                    if _match_ci(data, size, pos, b'</script', 8):
+                        break
+                    pos += 1
+            continue
+        if _match_ci(data, size, pos, b'<meta', 5) and (
+                pos + 5 >= size or _is_space(data[pos + 5])
+                or data[pos + 5] == b'>' or data[pos + 5] == b'/'):
+            attrs = {}
+            pos = _parse_attrs(data, size, pos + 5, attrs)
+            if b'name' in attrs and b'content' in attrs:
+                value_start, value_end = attrs[b'name']
+                name = _text(data, value_start, value_end).lower()
+                value_start, value_end = attrs[b'content']
+                meta[name] = _text(data, value_start, value_end)
+            continue
+        pos += 1
+
+    return scripts, meta
@@ -1,5 +1,13 @@
 from setuptools import setup, find_packages
 
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(['Wappalyzer/_htmlscan.pyx'], language_level=3)
+except ImportError:
+    # Without Cython the accelerated HTML scanner is skipped and the
+    # lxml fallback in WebPage._parse_html is used.
+    ext_modules = []
+
 setup(
     name="python-Wappalyzer",
     version="0.2.3",
@@ -16,11 +24,17 @@ setup(
         'Topic :: Internet :: WWW/HTTP',
     ],
     packages=find_packages(),
+    ext_modules=ext_modules,
     package_data={'Wappalyzer': ['data/apps.json']},
     install_requires=[
         'beautifulsoup4',
         'lxml',
         'requests',
         'aiohttp',
-    ]
+        'regex',
+    ],
+    extras_require={
+        'hyperscan': ['hyperscan'],
+        'ahocorasick': ['pyahocorasick'],
+    }
 )
@@ -1,7 +1,9 @@
 import pytest
 import asyncio
+import sys
 from httpretty import HTTPretty, httprettified
 from Wappalyzer import WebPage, Wappalyzer
+from Wappalyzer.Wappalyzer import _get_default_session
 from aioresponses import aioresponses
 
 @pytest.fixture
@@ -26,6 +28,52 @@ async def test_new_from_url_async(async_mock):
 
     assert webpage.html == 'snerble'
 
+def test_default_session_per_event_loop():
+    async def fetch_session():
+        session = await _get_default_session(True)
+        # Reused within one loop
+        assert await _get_default_session(True) is session
+        return session
+
+    # Each asyncio.run gets its own loop; the session from the first,
+    # now-closed loop must not be handed out again.
+    first = asyncio.run(fetch_session())
+    second = asyncio.run(fetch_session())
+
+    assert second is not first
+    assert not second.closed
+
+def test_parse_html():
+    webpage = WebPage('http://example.com', '''
+        <html><head>
+        <script src="/a.js"></script>
+        <SCRIPT SRC="/b.js"></SCRIPT>
+        <script>var s = "<meta name=fake content=bad>";</script>
+        <!-- <script src="/commented.js"></script> -->
+        <meta NAME="Generator" content="WordPress 5.4" />
+        </head><body></body></html>''', {})
+
+    assert webpage.scripts == ['/a.js', '/b.js']
+    assert webpage.meta == {'generator': 'WordPress 5.4'}
+
+def test_parse_html_entities(monkeypatch):
+    html = '''
+        <html><head>
+        <script src="/a.js?x=1&amp;y=2"></script>
+        <meta name="generator" content="A &amp; B" />
+        </head><body></body></html>'''
+
+    webpage = WebPage('http://example.com', html, {})
+    assert webpage.scripts == ['/a.js?x=1&y=2']
+    assert webpage.meta == {'generator': 'A & B'}
+
+    # Same document through the lxml fallback path
+    module = sys.modules['Wappalyzer.Wappalyzer']
+    monkeypatch.setattr(module, '_htmlscan', None)
+    webpage = WebPage('http://example.com', html, {})
+    assert webpage.scripts == ['/a.js?x=1&y=2']
+    assert webpage.meta == {'generator': 'A & B'}
+
 def test_latest():
     analyzer = Wappalyzer.latest()
 
@@ -58,6 +106,47 @@ def test_get_implied_apps():
 
     assert implied_apps == set(['a', 'b', 'c'])
 
+def test_analyze_headers_case_insensitive():
+    analyzer = Wappalyzer(categories={}, apps={
+        'a': {
+            'headers': {'Server': 'nginx'},
+        },
+    })
+    webpage = WebPage('http://example.com', '<html></html>', {'SERVER': 'nginx'})
+
+    detected_apps = analyzer.analyze(webpage)
+
+    assert detected_apps == set(['a'])
+
+def test_prepare_pattern_interning():
+    analyzer = Wappalyzer(categories={}, apps={})
+    string = 'jquery-([0-9.]+)\\.js\\;version:\\1'
+
+    pattern = analyzer._prepare_pattern(string)
+
+    assert pattern['string'] == 'jquery-([0-9.]+)\\.js'
+    assert pattern['version'] == '\\1'
+    # Cached under the full pattern string, not the attribute name
+    assert Wappalyzer._pattern_cache[string] is pattern
+    assert analyzer._prepare_pattern(string) is pattern
+    assert analyzer._prepare_pattern('version')['string'] == 'version'
+
+def test_analyze_scripts_anchored():
+    analyzer = Wappalyzer(categories={}, apps={
+        'a': {
+            'script': '^https://cdn\\.example\\.com/widget\\.js$',
+        },
+    })
+    webpage = WebPage('http://example.com', '''
+        <html><head>
+        <script src="/local/first.js"></script>
+        <script src="https://cdn.example.com/widget.js"></script>
+        </head><body></body></html>''', {})
+
+    detected_apps = analyzer.analyze(webpage)
+
+    assert detected_apps == set(['a'])
+
 def test_get_analyze_with_categories():
     webpage = WebPage('http://example.com', '<html>aaa</html>', {})
     categories = {